@@ -2,20 +2,98 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, CONF_PERSON, CONF_DEVICE_TRACKER
+from .const import (
+    DOMAIN,
+    CONF_PERSON,
+    CONF_DEVICE_TRACKER,
+    DATA_TRACE_RECORDER,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_RECORDING,
+    ATTR_FILENAME,
+    VISIT_STORAGE_VERSION,
+    VISIT_STORAGE_KEY,
+)
+from .trace_replay import TraceRecorder, source_entities
+from .util import get_device_trackers
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[str] = ["sensor", "device_tracker", "text"]
 
 
+def _trace_filename(value: str) -> str:
+    """Only accept a bare file name; traces always live in the integration's directory."""
+    value = cv.string(value)
+    if not value or os.path.basename(value) != value or value in (".", ".."):
+        raise vol.Invalid("Expected a file name without a directory")
+    return value
+
+
+START_RECORDING_SCHEMA = vol.Schema({
+    vol.Required(ATTR_FILENAME): _trace_filename,
+    vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+})
+
+
+def _trace_path(hass: HomeAssistant, filename: str) -> str:
+    """Return where a trace is kept: <config>/enhanced_people/<filename>."""
+    return hass.config.path(DOMAIN, filename)
+
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Enhanced People integration."""
+
+    async def async_start_recording(call: ServiceCall) -> None:
+        if hass.data.get(DATA_TRACE_RECORDER) is not None:
+            raise HomeAssistantError("A trace is already being recorded")
+        entity_ids = call.data.get(ATTR_ENTITY_ID) or source_entities(hass)
+        if not entity_ids:
+            raise HomeAssistantError("No source entities to record")
+        entries = [
+            {"title": entry.title, "data": dict(entry.data), "options": dict(entry.options)}
+            for entry in hass.config_entries.async_entries(DOMAIN)
+        ]
+        recorder = TraceRecorder(
+            hass, entity_ids, entries, _trace_path(hass, call.data[ATTR_FILENAME])
+        )
+        hass.data[DATA_TRACE_RECORDER] = recorder
+        try:
+            await recorder.async_start()
+        except OSError as e:
+            hass.data.pop(DATA_TRACE_RECORDER, None)
+            raise HomeAssistantError(f"Unable to record trace {recorder.path}: {e}") from e
+
+    async def async_stop_recording(call: ServiceCall) -> ServiceResponse:
+        recorder: TraceRecorder | None = hass.data.pop(DATA_TRACE_RECORDER, None)
+        if recorder is None:
+            raise HomeAssistantError("No trace is being recorded")
+        records = await recorder.async_stop()
+        return {"path": recorder.path, "records": records}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_START_RECORDING, async_start_recording, schema=START_RECORDING_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_RECORDING,
+        async_stop_recording,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async_setup_websocket_api(hass)
     return True
 
 
@@ -26,7 +104,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if CONF_PERSON not in entry.data:
             _LOGGER.error(f"Missing required configuration: {CONF_PERSON}")
             return False
-        if CONF_DEVICE_TRACKER not in entry.data:
+        if not get_device_trackers(entry.data):
             _LOGGER.error(f"Missing required configuration: {CONF_DEVICE_TRACKER}")
             return False
             
@@ -54,4 +132,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return unload_ok
     except Exception as e:
         _LOGGER.error(f"Error unloading Enhanced People integration: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored visit log of a deleted entry."""
+    await Store(hass, VISIT_STORAGE_VERSION, f"{VISIT_STORAGE_KEY}.{entry.entry_id}").async_remove()
@@ -4,7 +4,7 @@ import logging
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.selector import (
     EntitySelector,
@@ -18,17 +18,19 @@ from .const import (
     CONF_WIFI_SENSOR,
     CONF_PLACES_ENTITY,
     CONF_CATEGORY,
+    CONF_VISIT_RADIUS,
+    CONF_VISIT_MIN_DWELL,
+    DEFAULT_VISIT_RADIUS,
+    DEFAULT_VISIT_MIN_DWELL,
 )
+from .util import get_device_trackers
 
 STEP_USER_DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_PERSON): EntitySelector(
         EntitySelectorConfig(domain="person")
     ),
     vol.Required(CONF_DEVICE_TRACKER): EntitySelector(
-        EntitySelectorConfig(
-            domain="device_tracker",
-            integration="mobile_app"
-        )
+        EntitySelectorConfig(domain="device_tracker", multiple=True)
     ),
     vol.Optional(CONF_PLACES_ENTITY): EntitySelector(
         EntitySelectorConfig(domain="sensor", integration="places")
@@ -52,12 +54,19 @@ class EnhancedPeopleConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._existing_categories = []
 
     async def async_step_user(self, user_input=None):
+        if user_input is not None and not get_device_trackers(user_input):
+            return self.async_show_form(
+                step_id="user",
+                data_schema=STEP_USER_DATA_SCHEMA,
+                errors={CONF_DEVICE_TRACKER: "no_device_tracker"},
+            )
+
         if user_input is not None:
             self._user_input = user_input
 
-            # Try auto-selecting Wi-Fi sensor from same device as tracker
+            # Try auto-selecting Wi-Fi sensor from same device as the primary tracker
             entity_registry = er.async_get(self.hass)
-            tracker = user_input[CONF_DEVICE_TRACKER]
+            tracker = get_device_trackers(user_input)[0]
             tracker_entry = entity_registry.async_get(tracker)
 
             if tracker_entry and tracker_entry.device_id:
@@ -98,7 +107,7 @@ class EnhancedPeopleConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_wifi_sensor_fallback(self, user_input=None):
         entity_registry = er.async_get(self.hass)
-        tracker = self._user_input[CONF_DEVICE_TRACKER]
+        tracker = get_device_trackers(self._user_input)[0]
         tracker_entry = entity_registry.async_get(tracker)
         wifi_options = []
 
@@ -217,7 +226,9 @@ class EnhancedPeopleConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         
         return self.async_create_entry(title=title, data=self._user_input, options=options)
         
-    async def async_get_options_flow(self, config_entry):
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
         """Get the options flow for this handler."""
         return EnhancedPeopleOptionsFlowHandler(config_entry)
 
@@ -239,6 +250,16 @@ class EnhancedPeopleOptionsFlowHandler(config_entries.OptionsFlow):
                 default=self.config_entry.options.get(CONF_CATEGORY, ""),
                 description="Person Type"
             ): str,
+            vol.Required(
+                CONF_VISIT_RADIUS,
+                default=self.config_entry.options.get(CONF_VISIT_RADIUS, DEFAULT_VISIT_RADIUS),
+                description="Visit radius (m)"
+            ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+            vol.Required(
+                CONF_VISIT_MIN_DWELL,
+                default=self.config_entry.options.get(CONF_VISIT_MIN_DWELL, DEFAULT_VISIT_MIN_DWELL),
+                description="Minimum visit duration (s)"
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
         })
 
         return self.async_show_form(step_id="init", data_schema=options_schema)
\ No newline at end of file
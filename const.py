@@ -0,0 +1,43 @@
+"""Constants for the Enhanced People integration."""
+
+DOMAIN = "enhanced_people"
+
+CONF_PERSON = "person"
+CONF_DEVICE_TRACKER = "device_tracker"
+CONF_WIFI_SENSOR = "wifi_sensor"
+CONF_PLACES_ENTITY = "places_entity"
+CONF_CATEGORY = "category"
+
+# Trace recording
+DATA_TRACE_RECORDER = f"{DOMAIN}_trace_recorder"
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+ATTR_FILENAME = "filename"
+
+# Source tracker arbitration: seconds of recency one metre of GPS accuracy is worth
+ACCURACY_PENALTY = 1.0
+# Accuracy (m) assumed for fixes that report none, e.g. many vehicle trackers
+MISSING_ACCURACY = 500
+
+# Location feed for dashboards
+DATA_LOCATIONS = f"{DOMAIN}_locations"
+SIGNAL_LOCATION_UPDATED = f"{DOMAIN}_location_updated"
+WS_SUBSCRIBE_LOCATIONS = f"{DOMAIN}/subscribe_locations"
+
+# Stay-point (visit) detection
+CONF_VISIT_RADIUS = "visit_radius"
+CONF_VISIT_MIN_DWELL = "visit_min_dwell"
+DEFAULT_VISIT_RADIUS = 100
+DEFAULT_VISIT_MIN_DWELL = 300
+VISIT_LOG_SIZE = 50
+# Fastest average speed (m/s) across a silent gap that still counts as staying put
+VISIT_MAX_GAP_SPEED = 2.0
+# Speed (m/s) assumed for the trip after a silent stay, to estimate when it ended
+VISIT_TRAVEL_SPEED = 10.0
+VISIT_STORAGE_VERSION = 1
+VISIT_STORAGE_KEY = f"{DOMAIN}.visits"
+VISIT_SAVE_DELAY = 60
+EVENT_VISIT_START = f"{DOMAIN}_visit_start"
+EVENT_VISIT_END = f"{DOMAIN}_visit_end"
+SERVICE_EXPORT_VISITS = "export_visits"
+ATTR_FORMAT = "format"
@@ -1,69 +1,296 @@
-from homeassistant.core import HomeAssistant
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, Event, State, ServiceResponse, SupportsResponse, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import Store
 from homeassistant.components.device_tracker.config_entry import TrackerEntity
 
-from .const import DOMAIN, CONF_DEVICE_TRACKER, CONF_PERSON, CONF_CATEGORY
+from .const import (
+    DOMAIN,
+    CONF_PERSON,
+    CONF_CATEGORY,
+    ACCURACY_PENALTY,
+    MISSING_ACCURACY,
+    DATA_LOCATIONS,
+    SIGNAL_LOCATION_UPDATED,
+    CONF_VISIT_RADIUS,
+    CONF_VISIT_MIN_DWELL,
+    DEFAULT_VISIT_RADIUS,
+    DEFAULT_VISIT_MIN_DWELL,
+    VISIT_STORAGE_VERSION,
+    VISIT_STORAGE_KEY,
+    VISIT_SAVE_DELAY,
+    SERVICE_EXPORT_VISITS,
+    ATTR_FORMAT,
+)
+from .util import get_device_trackers
+from .visits import StayPointDetector
 
 # FIXED: Just define the constant yourself
 SOURCE_TYPE_GPS = "gps"
 
 
+@dataclass(slots=True)
+class Fix:
+    """A position reported by one source tracker."""
+
+    source: str
+    latitude: float
+    longitude: float
+    accuracy: float | None
+    timestamp: float
+
+    @property
+    def effective_accuracy(self) -> float:
+        """Reported accuracy, or the conservative MISSING_ACCURACY when there is none."""
+        return MISSING_ACCURACY if self.accuracy is None else self.accuracy
+
+    @property
+    def score(self) -> float:
+        """Recency minus an accuracy penalty; higher is better and never changes with time."""
+        return self.timestamp - self.effective_accuracy * ACCURACY_PENALTY
+
+    @property
+    def position(self) -> tuple[str, float, float, float | None]:
+        return (self.source, self.latitude, self.longitude, self.accuracy)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     async_add_entities(await create_enhanced_people_trackers(hass, entry))
 
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_EXPORT_VISITS,
+        {vol.Optional(ATTR_FORMAT, default="geojson"): vol.In(["geojson", "csv"])},
+        "async_export_visits",
+        supports_response=SupportsResponse.ONLY,
+    )
+
 
 async def create_enhanced_people_trackers(hass: HomeAssistant, entry: ConfigEntry) -> list[TrackerEntity]:
     # Check if required data is available
-    if CONF_DEVICE_TRACKER not in entry.data or not entry.data[CONF_DEVICE_TRACKER]:
+    tracker_entity_ids = get_device_trackers(entry.data)
+    if not tracker_entity_ids:
         return []
     if CONF_PERSON not in entry.data or not entry.data[CONF_PERSON]:
         return []
         
-    tracker_entity_id = entry.data[CONF_DEVICE_TRACKER]
     person_entity = entry.data[CONF_PERSON]
-    category = entry.data.get(CONF_CATEGORY, "")
+    # The category lives in options since it became editable; older entries kept it in data
+    category = entry.options.get(CONF_CATEGORY) or entry.data.get(CONF_CATEGORY, "")
     entry_id = entry.entry_id
 
     person_state = hass.states.get(person_entity)
     person_name = person_state.name if person_state and hasattr(person_state, 'name') else person_entity
 
-    return [EnhancedPersonTracker(tracker_entity_id, person_name, category, entry_id)]
+    visits = StayPointDetector(
+        entry.options.get(CONF_VISIT_RADIUS, DEFAULT_VISIT_RADIUS),
+        entry.options.get(CONF_VISIT_MIN_DWELL, DEFAULT_VISIT_MIN_DWELL),
+    )
+
+    return [EnhancedPersonTracker(tracker_entity_ids, person_entity, person_name, category, entry_id, visits)]
 
 
 class EnhancedPersonTracker(TrackerEntity):
-    def __init__(self, source_entity: str, person_name: str, category: str, entry_id: str):
-        self._source_entity = source_entity
+    """Location of a person, fused from one or more source device trackers.
+
+    Each source keeps its latest fix; the tracker reports whichever fix has the
+    best score. Because a fix's score is fixed once received, an incoming fix
+    only has to be compared with the current best. The sources are only
+    re-arbitrated when the best source itself reports a worse fix.
+    """
+
+    should_poll = False
+
+    def __init__(
+        self,
+        source_entities: list[str],
+        person_entity: str,
+        person_name: str,
+        category: str,
+        entry_id: str,
+        visits: StayPointDetector,
+    ):
+        self._source_entities = source_entities
+        self._person_entity = person_entity
+        self._presence: str | None = None
         self._person_name = person_name
         self._category = category or ""
         self._entry_id = entry_id
+        self._fixes: dict[str, Fix] = {}
+        self._best: Fix | None = None
+        self._visits = visits
+        self._visit_fix_timestamp: float | None = None
+        self._visit_store: Store | None = None
         self._attr_name = f"{person_name}"
-        self._attr_unique_id = f"{source_entity}_enhanced_tracker"
+        # Keyed on the primary tracker so entries created with a single tracker keep their id
+        self._attr_unique_id = f"{source_entities[0]}_enhanced_tracker"
+
+    async def async_added_to_hass(self) -> None:
+        # Visits survive restarts and reloads so the log stays exportable and open visits still end
+        self._visit_store = Store(
+            self.hass, VISIT_STORAGE_VERSION, f"{VISIT_STORAGE_KEY}.{self._entry_id}"
+        )
+        if stored := await self._visit_store.async_load():
+            self._visits.restore(stored)
+
+        for entity_id in self._source_entities:
+            self._update_fix(self.hass.states.get(entity_id))
+        person_state = self.hass.states.get(self._person_entity)
+        self._presence = person_state.state if person_state else None
+
+        self.async_on_remove(
+            async_track_state_change_event(
+                self.hass, self._source_entities, self._async_source_changed
+            )
+        )
+        self.async_on_remove(
+            async_track_state_change_event(
+                self.hass, [self._person_entity], self._async_person_changed
+            )
+        )
+        entry = self.hass.config_entries.async_get_entry(self._entry_id)
+        if entry is not None:
+            self.async_on_remove(entry.add_update_listener(self._async_entry_updated))
+        self.async_on_remove(self._async_unpublish)
+        self._async_update_visits()
+        self._async_publish()
+
+    @callback
+    def _async_source_changed(self, event: Event) -> None:
+        changed = self._update_fix(event.data.get("new_state"))
+        if self._async_update_visits() or changed:
+            self.async_write_ha_state()
+        if changed:
+            self._async_publish()
+
+    @callback
+    def _async_person_changed(self, event: Event) -> None:
+        new_state = event.data.get("new_state")
+        self._presence = new_state.state if new_state else None
+        self._async_publish()
+
+    async def _async_entry_updated(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self._visits.radius = entry.options.get(CONF_VISIT_RADIUS, DEFAULT_VISIT_RADIUS)
+        self._visits.min_dwell = entry.options.get(CONF_VISIT_MIN_DWELL, DEFAULT_VISIT_MIN_DWELL)
+
+        category = entry.options.get(CONF_CATEGORY) or entry.data.get(CONF_CATEGORY, "")
+        if category != self._category:
+            self._category = category
+            self.async_write_ha_state()
+            self._async_publish()
+
+    @callback
+    def _async_update_visits(self) -> bool:
+        """Feed the best fix to the stay-point detector. Returns True if a visit started or ended."""
+        best = self._best
+        if best is None or (
+            self._visit_fix_timestamp is not None and best.timestamp <= self._visit_fix_timestamp
+        ):
+            return False
+        self._visit_fix_timestamp = best.timestamp
+        events = self._visits.update(
+            best.latitude, best.longitude, best.timestamp, best.effective_accuracy
+        )
+        self._async_fire_visit_events(events)
+        if self._visit_store is not None:
+            self._visit_store.async_delay_save(self._visits.as_storage, VISIT_SAVE_DELAY)
+        return bool(events)
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._visit_store is not None:
+            await self._visit_store.async_save(self._visits.as_storage())
+
+    @callback
+    def _async_fire_visit_events(self, events: list) -> None:
+        for event_type, data in events:
+            self.hass.bus.async_fire(
+                event_type, {"entity_id": self.entity_id, "person": self._person_name, **data}
+            )
+
+    async def async_export_visits(self, format: str) -> ServiceResponse:
+        """Return the completed visits as GeoJSON or CSV."""
+        if format == "geojson":
+            return self._visits.as_geojson()
+
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(self._visits.as_csv_rows())
+        return {"csv": buffer.getvalue()}
+
+    @callback
+    def _async_publish(self) -> None:
+        """Share the current location with the dashboard feed if it changed."""
+        record = {
+            "name": self._person_name,
+            "lat": round(self._best.latitude, 6) if self._best else None,
+            "lon": round(self._best.longitude, 6) if self._best else None,
+            "acc": round(self._best.effective_accuracy) if self._best else None,
+            "presence": self._presence,
+            "category": self._category,
+        }
+        locations = self.hass.data.setdefault(DATA_LOCATIONS, {})
+        if locations.get(self.entity_id) == record:
+            return
+        locations[self.entity_id] = record
+        async_dispatcher_send(self.hass, SIGNAL_LOCATION_UPDATED, self.entity_id)
+
+    @callback
+    def _async_unpublish(self) -> None:
+        self.hass.data.get(DATA_LOCATIONS, {}).pop(self.entity_id, None)
+        async_dispatcher_send(self.hass, SIGNAL_LOCATION_UPDATED, self.entity_id)
+
+    def _update_fix(self, state: State | None) -> bool:
+        """Store the fix carried by a source state. Returns True if the reported position changed."""
+        if state is None:
+            return False
+        accuracy = state.attributes.get("gps_accuracy")
+        try:
+            fix = Fix(
+                source=state.entity_id,
+                latitude=float(state.attributes["latitude"]),
+                longitude=float(state.attributes["longitude"]),
+                accuracy=float(accuracy) if accuracy is not None else None,
+                timestamp=state.last_updated.timestamp(),
+            )
+        except (KeyError, ValueError, TypeError):
+            return False
+
+        previous = self._best
+        self._fixes[fix.source] = fix
+        if previous is None or fix.score >= previous.score:
+            self._best = fix
+        elif previous.source == fix.source:
+            self._best = max(self._fixes.values(), key=lambda f: f.score)
+        else:
+            return False
+
+        # Repeated payloads refresh the fix but need no state write
+        return previous is None or previous.position != self._best.position
 
     @property
     def latitude(self):
-        try:
-            state = self.hass.states.get(self._source_entity)
-            if state and hasattr(state, 'attributes') and "latitude" in state.attributes:
-                lat = state.attributes.get("latitude")
-                return float(lat) if lat is not None else None
-        except (ValueError, TypeError):
-            pass
-        return None
+        return self._best.latitude if self._best else None
 
     @property
     def longitude(self):
-        try:
-            state = self.hass.states.get(self._source_entity)
-            if state and hasattr(state, 'attributes') and "longitude" in state.attributes:
-                lon = state.attributes.get("longitude")
-                return float(lon) if lon is not None else None
-        except (ValueError, TypeError):
-            pass
-        return None
+        return self._best.longitude if self._best else None
+
+    @property
+    def location_accuracy(self):
+        return int(self._best.effective_accuracy) if self._best else 0
 
     @property
     def source_type(self):
@@ -72,23 +299,17 @@ class EnhancedPersonTracker(TrackerEntity):
     @property
     def extra_state_attributes(self):
         attributes = {
-            "source_entity": self._source_entity,
+            "source_entity": self._best.source if self._best else self._source_entities[0],
+            "source_entities": self._source_entities,
             "category": self._category,
             "person": self._person_name,
             "source_device_longitude": self.longitude,
             "source_device_latitude": self.latitude,
         }
-        
-        # Safely get gps_accuracy
-        try:
-            state = self.hass.states.get(self._source_entity)
-            if state and hasattr(state, 'attributes'):
-                gps_accuracy = state.attributes.get("gps_accuracy")
-                if gps_accuracy is not None:
-                    attributes["source_device_gps_accuracy"] = gps_accuracy
-        except Exception:
-            pass
-                
+        if self._best and self._best.accuracy is not None:
+            attributes["source_device_gps_accuracy"] = self._best.accuracy
+        attributes["current_visit"] = self._visits.current_visit
+
         return attributes
 
     @property
@@ -9,11 +9,11 @@ from homeassistant.components.sensor import SensorEntity
 from .const import (
     DOMAIN,
     CONF_PERSON,
-    CONF_DEVICE_TRACKER,
     CONF_WIFI_SENSOR,
     CONF_PLACES_ENTITY,
     CONF_CATEGORY,
 )
+from .util import get_device_trackers
 
 
 async def create_enhanced_people_sensors(hass: HomeAssistant, entry: ConfigEntry) -> list[Entity]:
@@ -22,7 +22,8 @@ async def create_enhanced_people_sensors(hass: HomeAssistant, entry: ConfigEntry
 
     data = entry.data
     person_entity = data[CONF_PERSON]
-    tracker_entity = data[CONF_DEVICE_TRACKER]
+    # The GPS Location sensor follows the primary (first) tracker
+    tracker_entity = get_device_trackers(data)[0]
     wifi_entity = data.get(CONF_WIFI_SENSOR)
     places_entity = data.get(CONF_PLACES_ENTITY)
     category = data.get(CONF_CATEGORY)
@@ -0,0 +1,374 @@
+"""Record and replay source state-change traces for Enhanced People.
+
+A trace is a JSON Lines file (optionally gzip-compressed when the path ends
+in ``.gz``). The first line is a header, every following line is one state
+change of a source entity:
+
+    {"v": 1, "recorded_at": "...", "entities": [...], "entries": [...], "snapshot": 4}
+    {"t": 0.0, "u": 1792396800.512, "e": "device_tracker.phone", "s": "home", "a": {...}}
+    {"t": 4.132, "u": 1792396804.644, "e": "device_tracker.phone", "s": "home"}
+
+``t`` is the offset in seconds from the start of the recording and only paces
+the replay. ``u`` is the state's original ``last_updated`` timestamp, which is
+restored on replay, so fix recency and dwell times match the recording at any
+replay speed. ``a`` is
+only written when the attributes differ from the previous record for the
+same entity, which keeps bursty and duplicate payloads small on disk. The
+header carries the Enhanced People config entries at recording time, and
+``snapshot`` counts the leading records holding the states when recording
+started.
+
+Traces are replayed into a throwaway Home Assistant instance with its own
+temporary config directory, never into the instance they were recorded on:
+
+    python -m custom_components.enhanced_people.trace_replay trace.jsonl.gz --speed 10
+
+This needs the pytest-homeassistant-custom-component package.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    CONF_PERSON,
+    CONF_DEVICE_TRACKER,
+    CONF_WIFI_SENSOR,
+    CONF_PLACES_ENTITY,
+    DATA_TRACE_RECORDER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+TRACE_FLUSH_SIZE = 500
+TRACE_FLUSH_INTERVAL = timedelta(seconds=10)
+
+SOURCE_KEYS = (CONF_PERSON, CONF_DEVICE_TRACKER, CONF_WIFI_SENSOR, CONF_PLACES_ENTITY)
+
+
+def source_entities(hass: HomeAssistant) -> list[str]:
+    """Return the source entities behind all configured Enhanced People entries."""
+    entities: set[str] = set()
+    for data in hass.data.get(DOMAIN, {}).values():
+        for key in SOURCE_KEYS:
+            value = data.get(key)
+            if isinstance(value, str):
+                entities.add(value)
+            elif value:
+                entities.update(value)
+    return sorted(entities)
+
+
+def _jsonable(value: Any) -> Any:
+    """Round-trip a value through JSON so datetimes and the like become strings."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def _open_trace(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _open_for_writing(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Never overwrite an earlier capture; FileExistsError surfaces to the service call
+    return _open_trace(path, "x")
+
+
+def _write_lines(trace, lines: list[dict[str, Any]]) -> None:
+    for line in lines:
+        trace.write(json.dumps(line, separators=(",", ":"), default=str))
+        trace.write("\n")
+    trace.flush()
+
+
+def _read_trace(path: str) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    with _open_trace(path, "r") as trace:
+        lines = [json.loads(line) for line in trace if line.strip()]
+    if not lines or lines[0].get("v") != TRACE_VERSION:
+        raise ValueError(f"{path} is not a version {TRACE_VERSION} Enhanced People trace")
+    return lines[0], lines[1:]
+
+
+class TraceRecorder:
+    """Append state changes of a set of entities to a trace file.
+
+    Records are buffered and written in batches from the executor, at most
+    every TRACE_FLUSH_INTERVAL or once TRACE_FLUSH_SIZE records are pending,
+    so a long capture holds little in memory and survives a crash up to the
+    last batch. Recording stops on its own when Home Assistant shuts down.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_ids: list[str],
+        entries: list[dict[str, Any]],
+        path: str,
+    ) -> None:
+        self.hass = hass
+        self.entity_ids = entity_ids
+        self.entries = entries
+        self.path = path
+        self.records = 0
+        self._trace = None
+        self._pending: list[dict[str, Any]] = []
+        self._write_lock = asyncio.Lock()
+        self._last_attributes: dict[str, dict[str, Any]] = {}
+        self._started = 0.0
+        self._unsubs: list = []
+        self._unsub_stop = None
+
+    async def async_start(self) -> None:
+        """Open the trace, snapshot the current states and start listening for changes."""
+        self._trace = await self.hass.async_add_executor_job(_open_for_writing, self.path)
+        self._started = time.monotonic()
+        header = {
+            "v": TRACE_VERSION,
+            "recorded_at": dt_util.utcnow().isoformat(),
+            "entities": self.entity_ids,
+            "entries": self.entries,
+        }
+        self._pending.append(header)
+        for entity_id in self.entity_ids:
+            state = self.hass.states.get(entity_id)
+            if state is not None:
+                self._append(state)
+        header["snapshot"] = self.records
+
+        self._unsubs = [
+            async_track_state_change_event(
+                self.hass, self.entity_ids, self._async_state_changed
+            ),
+            async_track_time_interval(self.hass, self._async_flush, TRACE_FLUSH_INTERVAL),
+        ]
+        self._unsub_stop = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_hass_stop
+        )
+        self._async_flush()
+        _LOGGER.debug("Recording state changes for %s to %s", self.entity_ids, self.path)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+        self._append(new_state)
+        if len(self._pending) >= TRACE_FLUSH_SIZE:
+            self._async_flush()
+
+    def _append(self, state: State) -> None:
+        entity_id = state.entity_id
+        attributes = dict(state.attributes)
+        record: dict[str, Any] = {
+            "t": round(time.monotonic() - self._started, 3),
+            "u": round(state.last_updated.timestamp(), 3),
+            "e": entity_id,
+            "s": state.state,
+        }
+        if self._last_attributes.get(entity_id) != attributes:
+            self._last_attributes[entity_id] = attributes
+            record["a"] = attributes
+        self._pending.append(record)
+        self.records += 1
+
+    @callback
+    def _async_flush(self, _now: Any = None) -> None:
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        self.hass.async_create_task(self._async_write(lines))
+
+    async def _async_write(self, lines: list[dict[str, Any]]) -> None:
+        # The lock is fair, so batches reach the file in the order they were flushed
+        async with self._write_lock:
+            if self._trace is not None:
+                await self.hass.async_add_executor_job(_write_lines, self._trace, lines)
+
+    async def _async_hass_stop(self, event: Event) -> None:
+        self._unsub_stop = None
+        if self.hass.data.get(DATA_TRACE_RECORDER) is self:
+            self.hass.data.pop(DATA_TRACE_RECORDER)
+        await self.async_stop()
+
+    async def async_stop(self) -> int:
+        """Stop listening, write what is left and close the trace. Returns the record count."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+        lines, self._pending = self._pending, []
+        async with self._write_lock:
+            if self._trace is not None:
+                trace, self._trace = self._trace, None
+                await self.hass.async_add_executor_job(_write_lines, trace, lines)
+                await self.hass.async_add_executor_job(trace.close)
+
+        _LOGGER.debug("Wrote %d trace records to %s", self.records, self.path)
+        return self.records
+
+
+def _apply(hass: HomeAssistant, record: dict[str, Any], attributes: dict[str, dict[str, Any]]) -> None:
+    entity_id = record["e"]
+    if "a" in record:
+        attributes[entity_id] = record["a"]
+    hass.states.async_set(
+        entity_id, record["s"], attributes.get(entity_id, {}), timestamp=record.get("u")
+    )
+
+
+async def async_replay_trace(
+    hass: HomeAssistant,
+    records: list[dict[str, Any]],
+    attributes: dict[str, dict[str, Any]],
+    speed: float = 1.0,
+) -> dict[str, Any]:
+    """Feed trace records to a stand-in instance and report what Enhanced People entities wrote.
+
+    ``speed`` scales the real-time pacing only (2.0 replays twice as fast, 0
+    replays every record back to back); states keep their recorded
+    ``last_updated``, so what the integration computes from it is unchanged.
+    """
+    registry = er.async_get(hass)
+    watched = {
+        entry.entity_id for entry in registry.entities.values() if entry.platform == DOMAIN
+    }
+    writes: dict[str, int] = {}
+    latencies: list[float] = []
+    last_injected: float | None = None
+
+    @callback
+    def _async_state_written(event: Event) -> None:
+        entity_id = event.data.get("entity_id")
+        if entity_id not in watched:
+            return
+        writes[entity_id] = writes.get(entity_id, 0) + 1
+        if last_injected is not None:
+            latencies.append(time.monotonic() - last_injected)
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _async_state_written)
+    offset = records[0]["t"] if records else 0.0
+    started = time.monotonic()
+    try:
+        for record in records:
+            if speed > 0:
+                delay = started + (record["t"] - offset) / speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            last_injected = time.monotonic()
+            _apply(hass, record, attributes)
+            # Let the integration's listeners run before injecting the next record
+            await asyncio.sleep(0)
+        await hass.async_block_till_done()
+    finally:
+        unsub()
+
+    duration = time.monotonic() - started
+    latency_ms: dict[str, float] = {}
+    if latencies:
+        ordered = sorted(latencies)
+        latency_ms = {
+            "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3),
+        }
+
+    final_states = {}
+    for entity_id in sorted(watched):
+        state = hass.states.get(entity_id)
+        if state is not None:
+            final_states[entity_id] = {
+                "state": state.state,
+                "attributes": _jsonable(dict(state.attributes)),
+            }
+
+    return {
+        "records": len(records),
+        "speed": speed,
+        "duration": round(duration, 3),
+        "total_writes": sum(writes.values()),
+        "writes": writes,
+        "latency_ms": latency_ms,
+        "final_states": final_states,
+    }
+
+
+async def async_replay_in_stand_in(path: str, speed: float = 1.0) -> dict[str, Any]:
+    """Replay a trace in a throwaway Home Assistant instance with a temporary config dir.
+
+    The recorded states are applied first, then the recorded config entries are
+    set up, then the remaining records are replayed. Nothing touches a real
+    instance, so no automations fire and no history is written.
+    """
+    # Test harness dependency, only needed when replaying
+    from homeassistant import loader
+    from homeassistant.setup import async_setup_component
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_test_home_assistant,
+    )
+
+    header, records = _read_trace(path)
+    snapshot = header.get("snapshot", 0)
+    attributes: dict[str, dict[str, Any]] = {}
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            # Allow loading this integration from custom_components
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            for record in records[:snapshot]:
+                _apply(hass, record, attributes)
+            for entry in header.get("entries", []):
+                MockConfigEntry(
+                    domain=DOMAIN,
+                    title=entry.get("title"),
+                    data=entry.get("data", {}),
+                    options=entry.get("options", {}),
+                ).add_to_hass(hass)
+            if not await async_setup_component(hass, DOMAIN, {}):
+                raise RuntimeError(f"Unable to set up {DOMAIN} in the stand-in instance")
+            await hass.async_block_till_done()
+
+            return await async_replay_trace(hass, records[snapshot:], attributes, speed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay an Enhanced People trace in a stand-in Home Assistant instance."
+    )
+    parser.add_argument("trace", help="trace file written by the start_recording service")
+    parser.add_argument(
+        "--speed", type=float, default=1.0,
+        help="playback speed; 1 is real time, 0 replays without waiting",
+    )
+    args = parser.parse_args()
+    report = asyncio.run(async_replay_in_stand_in(args.trace, args.speed))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""Helpers shared by the Enhanced People platforms."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from .const import CONF_DEVICE_TRACKER
+
+
+def get_device_trackers(data: Mapping[str, Any]) -> list[str]:
+    """Return the source device trackers of an entry.
+
+    Entries created before multi-source support store a single entity id.
+    """
+    trackers = data.get(CONF_DEVICE_TRACKER)
+    if not trackers:
+        return []
+    if isinstance(trackers, str):
+        return [trackers]
+    return list(trackers)
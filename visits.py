@@ -0,0 +1,177 @@
+"""Online stay-point (visit) detection for Enhanced People trackers."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+from homeassistant.util.location import distance
+
+from .const import (
+    EVENT_VISIT_START,
+    EVENT_VISIT_END,
+    VISIT_LOG_SIZE,
+    VISIT_MAX_GAP_SPEED,
+    VISIT_TRAVEL_SPEED,
+)
+
+
+def _isoformat(timestamp: float) -> str:
+    return dt_util.utc_from_timestamp(round(timestamp)).isoformat()
+
+
+@dataclass(slots=True)
+class Visit:
+    """A place someone stayed at; the position is the running centroid of its fixes."""
+
+    latitude: float
+    longitude: float
+    start: float
+    end: float
+    fixes: int = 1
+    estimated_end: bool = False
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "latitude": round(self.latitude, 6),
+            "longitude": round(self.longitude, 6),
+            "start": _isoformat(self.start),
+            "end": _isoformat(self.end),
+            "duration": round(self.duration),
+            "fixes": self.fixes,
+            "estimated_end": self.estimated_end,
+        }
+
+
+class StayPointDetector:
+    """Turn a stream of fixes into visit-start and visit-end events.
+
+    Only the candidate stay point, the confirmed current visit and a bounded
+    log of completed visits are kept, so memory is constant per person. A
+    candidate is anchored at the first fix after leaving the previous one and
+    absorbs every later fix within ``radius`` metres, widened by the fix's own
+    accuracy. Fixes less accurate than the radius itself cannot tell a stay
+    from a departure and are ignored. A candidate becomes a visit once
+    its in-radius fixes span ``min_dwell`` seconds.
+
+    Phones mostly go quiet while stationary, so a stay may only show up as an
+    arrival fix and a departure fix hours later. If the silent gap before
+    the departure fix lasted at least ``min_dwell`` and the implied speed
+    across it is no faster than VISIT_MAX_GAP_SPEED, the person most likely
+    spent the gap there. The stay then counts, with its end estimated as
+    the departure time minus the travel time at VISIT_TRAVEL_SPEED. A drive
+    with a silent phone implies a far higher speed and is not counted.
+    Otherwise a visit ends at its last in-radius fix. The departure fix is
+    reported as where the person went next.
+    """
+
+    def __init__(self, radius: float, min_dwell: float, log_size: int = VISIT_LOG_SIZE) -> None:
+        self.radius = radius
+        self.min_dwell = min_dwell
+        self.visits: deque[Visit] = deque(maxlen=log_size)
+        self.current: Visit | None = None
+        self._candidate: Visit | None = None
+
+    def update(
+        self, latitude: float, longitude: float, timestamp: float, accuracy: float = 0.0
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Feed one fix and return the events it caused."""
+        candidate = self._candidate
+        if accuracy > self.radius or (candidate is not None and timestamp < candidate.end):
+            return []
+
+        events: list[tuple[str, dict[str, Any]]] = []
+        if candidate is not None:
+            meters = distance(candidate.latitude, candidate.longitude, latitude, longitude)
+            if meters is not None and meters <= self.radius + accuracy:
+                candidate.fixes += 1
+                candidate.latitude += (latitude - candidate.latitude) / candidate.fixes
+                candidate.longitude += (longitude - candidate.longitude) / candidate.fixes
+                candidate.end = timestamp
+                if self.current is None and candidate.duration >= self.min_dwell:
+                    self.current = candidate
+                    return [(EVENT_VISIT_START, self.current_visit)]
+                return []
+
+            gap = timestamp - candidate.end
+            if (
+                meters is not None
+                and gap > 0
+                and gap >= self.min_dwell
+                and meters / gap <= VISIT_MAX_GAP_SPEED
+            ):
+                candidate.end = max(candidate.end, timestamp - meters / VISIT_TRAVEL_SPEED)
+                candidate.estimated_end = True
+                if self.current is None and candidate.duration >= self.min_dwell:
+                    self.current = candidate
+                    events.append((EVENT_VISIT_START, self.current_visit))
+
+            if self.current is not None:
+                visit = self.current
+                self.visits.append(visit)
+                self.current = None
+                events.append((EVENT_VISIT_END, {
+                    **visit.as_dict(),
+                    "left_at": _isoformat(timestamp),
+                    "next_latitude": latitude,
+                    "next_longitude": longitude,
+                }))
+
+        self._candidate = Visit(latitude, longitude, timestamp, timestamp)
+        return events
+
+    def as_storage(self) -> dict[str, Any]:
+        """Detector state for persisting across restarts."""
+        return {
+            "visits": [asdict(visit) for visit in self.visits],
+            "candidate": asdict(self._candidate) if self._candidate else None,
+            "confirmed": self.current is not None,
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore state saved by ``as_storage``."""
+        self.visits.extend(Visit(**visit) for visit in data.get("visits", []))
+        candidate = data.get("candidate")
+        self._candidate = Visit(**candidate) if candidate else None
+        # The current visit is always the candidate that was confirmed
+        self.current = self._candidate if data.get("confirmed") else None
+
+    @property
+    def current_visit(self) -> dict[str, Any] | None:
+        if self.current is None:
+            return None
+        return {
+            "latitude": round(self.current.latitude, 6),
+            "longitude": round(self.current.longitude, 6),
+            "start": _isoformat(self.current.start),
+        }
+
+    def as_geojson(self) -> dict[str, Any]:
+        """Completed visits as a GeoJSON FeatureCollection."""
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [round(visit.longitude, 6), round(visit.latitude, 6)],
+                    },
+                    "properties": visit.as_dict(),
+                }
+                for visit in self.visits
+            ],
+        }
+
+    def as_csv_rows(self):
+        """Completed visits as CSV rows, header first."""
+        columns = ["start", "end", "duration", "latitude", "longitude", "fixes", "estimated_end"]
+        yield columns
+        for visit in self.visits:
+            row = visit.as_dict()
+            yield [row[column] for column in columns]
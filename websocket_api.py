@@ -0,0 +1,93 @@
+"""Websocket feed of all Enhanced People locations for dashboards."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_LOCATIONS, SIGNAL_LOCATION_UPDATED, WS_SUBSCRIBE_LOCATIONS
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the Enhanced People websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe_locations)
+
+
+def _delta(previous: dict[str, Any], current: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): WS_SUBSCRIBE_LOCATIONS,
+    vol.Optional("interval", default=1.0): vol.All(
+        vol.Coerce(float), vol.Range(min=0.1, max=3600)
+    ),
+})
+@callback
+def websocket_subscribe_locations(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream a snapshot of every tracker, then batched deltas.
+
+    Updates are coalesced per tracker until the client's interval elapses, so
+    a burst of fixes costs one message. A delta only carries the fields that
+    changed since the client last heard about a tracker; a tracker that went
+    away is sent as null. Everything is served from the in-memory location
+    store the trackers publish to.
+    """
+    msg_id = msg["id"]
+    interval = msg["interval"]
+    locations: dict[str, dict[str, Any]] = hass.data.setdefault(DATA_LOCATIONS, {})
+    sent = {entity_id: dict(record) for entity_id, record in locations.items()}
+    dirty: set[str] = set()
+    cancel_flush = None
+
+    @callback
+    def _async_flush(_now: Any) -> None:
+        nonlocal cancel_flush
+        cancel_flush = None
+        delta: dict[str, Any] = {}
+        for entity_id in dirty:
+            current = locations.get(entity_id)
+            previous = sent.get(entity_id)
+            if current is None:
+                if previous is not None:
+                    delta[entity_id] = None
+                    del sent[entity_id]
+            elif previous is None:
+                delta[entity_id] = sent[entity_id] = dict(current)
+            elif changed := _delta(previous, current):
+                delta[entity_id] = changed
+                sent[entity_id] = dict(current)
+        dirty.clear()
+        if delta:
+            connection.send_message(websocket_api.event_message(msg_id, {"delta": delta}))
+
+    @callback
+    def _async_location_updated(entity_id: str) -> None:
+        nonlocal cancel_flush
+        dirty.add(entity_id)
+        if cancel_flush is None:
+            cancel_flush = async_call_later(hass, interval, _async_flush)
+
+    unsub_dispatcher = async_dispatcher_connect(
+        hass, SIGNAL_LOCATION_UPDATED, _async_location_updated
+    )
+
+    @callback
+    def _async_unsubscribe() -> None:
+        unsub_dispatcher()
+        if cancel_flush is not None:
+            cancel_flush()
+
+    connection.subscriptions[msg_id] = _async_unsubscribe
+    connection.send_result(msg_id)
+    connection.send_message(websocket_api.event_message(msg_id, {"snapshot": dict(sent)}))